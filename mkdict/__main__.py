@@ -0,0 +1,5 @@
+import sys
+
+from mkdict.cli import main
+
+sys.exit(main())
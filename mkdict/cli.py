@@ -0,0 +1,144 @@
+"""
+Command line interface: python -m mkdict <command>
+
+Only argparse and the editions table are imported at startup. Selenium,
+BeautifulSoup and the rest of the pipeline are imported inside the commands
+that use them, so --help and light commands like stats start quickly.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from mkdict.editions import EDITIONS, DEFAULT_EDITION
+
+PAGES_DIR = Path('pages')
+SRC_DIR = Path('kindle_src')
+DEST_DIR = Path('kindle_compiled')
+
+
+def selected_editions(args):
+    return [EDITIONS[code] for code in (args.editions or [DEFAULT_EDITION])]
+
+
+def scrape_command(args) -> int:
+    from concurrent.futures import ThreadPoolExecutor
+    from mkdict.scrape import download_pages
+
+    editions = selected_editions(args)
+    # Each edition is downloaded into <pages>/<code>/ by its own browser
+    with ThreadPoolExecutor(max_workers=len(editions)) as executor:
+        futures = [executor.submit(download_pages, args.indexes, args.pages / edition.code, edition)
+                   for edition in editions]
+        for future in futures:
+            future.result()
+
+    return 0
+
+
+def compile_command(args) -> int:
+    from mkdict.compile import load_kindle_sources, compile_editions
+
+    sources = load_kindle_sources(args.src)
+    if not compile_editions(selected_editions(args), args.pages, args.dest, sources, compact=args.compact):
+        return 1
+    return 0
+
+
+def package_command(args) -> int:
+    from mkdict.compile import package_build, archive_path
+
+    packaged = True
+    for edition in selected_editions(args):
+        build_dir = args.dest / edition.code
+        if not build_dir.is_dir():
+            print(f"[{edition.code}] {build_dir} not found, run compile first")
+            packaged = False
+            continue
+        packaged &= package_build(build_dir, archive_path(args.dest, edition),
+                                  lambda message: print(f"[{edition.code}] {message}"))
+
+    return 0 if packaged else 1
+
+
+def count_occurrences(file_path: Path, needle: bytes, block_size=1 << 20) -> int:
+    """ Count occurrences of needle in a file without loading it into memory."""
+    count = 0
+    tail = b''
+    with open(file_path, 'rb') as f:
+        while block := f.read(block_size):
+            data = tail + block
+            count += data.count(needle)
+            # Keep the end of the block in case the needle spans two blocks,
+            # it is shorter than the needle so no match is counted twice
+            tail = data[-(len(needle) - 1):] if len(needle) > 1 else b''
+    return count
+
+
+def stats_command(args) -> int:
+    for edition in selected_editions(args):
+        print(f"{edition.code} ({edition.title})")
+
+        pages_dir = args.pages / edition.code
+        page_files = list(pages_dir.glob('page_*.html')) if pages_dir.is_dir() else []
+        page_bytes = sum(page_file.stat().st_size for page_file in page_files)
+        print(f"  pages: {len(page_files)} ({page_bytes} bytes) in {pages_dir}")
+
+        content_file = args.dest / edition.code / 'content000.xhtml'
+        if content_file.is_file():
+            entries = count_occurrences(content_file, b'<idx:entry ')
+            print(f"  compiled entries: {entries} ({content_file.stat().st_size} bytes) in {content_file}")
+        else:
+            print(f"  compiled entries: none, {content_file} not found")
+
+        # Same location as mkdict.compile.archive_path, without importing the pipeline
+        archive_file = args.dest.parent / f"kindle_dictionary_{edition.code}.zip"
+        if archive_file.is_file():
+            print(f"  archive: {archive_file} ({archive_file.stat().st_size} bytes)")
+
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    # Options shared by all commands, accepted after the command name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--pages', type=Path, default=PAGES_DIR,
+                        help=f'Directory with downloaded pages, one subdirectory per edition (default: {PAGES_DIR}).')
+    common.add_argument('--src', type=Path, default=SRC_DIR,
+                        help=f'Kindle source directory with templates and assets (default: {SRC_DIR}).')
+    common.add_argument('--dest', type=Path, default=DEST_DIR,
+                        help=f'Directory the editions are compiled into (default: {DEST_DIR}).')
+    common.add_argument('--edition', dest='editions', action='append', choices=sorted(EDITIONS),
+                        help=f'Edition to work on, can be repeated (default: {DEFAULT_EDITION}).')
+
+    parser = argparse.ArgumentParser(prog='mkdict', description='Build Kindle dictionaries from ordbokene.no.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scrape_parser = subparsers.add_parser('scrape', parents=[common], help='Download pages by index or range.')
+    scrape_parser.add_argument('indexes', type=str,
+                               help='Comma-separated list of single indexes or ranges (e.g., "1,2,10-20,22,30-50").')
+    scrape_parser.set_defaults(func=scrape_command)
+
+    compile_parser = subparsers.add_parser('compile', parents=[common],
+                                           help='Compile, validate and package downloaded pages.')
+    compile_parser.add_argument('--compact', action='store_true',
+                                help='Emit minified XHTML with short class names and a matching stylesheet.')
+    compile_parser.set_defaults(func=compile_command)
+
+    package_parser = subparsers.add_parser('package', parents=[common],
+                                           help='Validate and zip already compiled editions.')
+    package_parser.set_defaults(func=package_command)
+
+    stats_parser = subparsers.add_parser('stats', parents=[common],
+                                         help='Show downloaded pages and compiled entries per edition.')
+    stats_parser.set_defaults(func=stats_command)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import heapq
+import json
+import tempfile
+import unicodedata
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple, List
+
+from mkdict.dict_entry import DictionaryEntry, VALID_PARTS_OF_SPEECH
+
+# Norwegian alphabetical order, æ, ø and å come after z
+NORWEGIAN_ALPHABET = "abcdefghijklmnopqrstuvwxyzæøå"
+# Foreign letters that Norwegian sorts as a letter of its own alphabet
+FOREIGN_LETTERS = {"ü": "y", "ä": "æ", "ö": "ø", "ð": "d", "þ": "t"}
+
+# Letters sort after digits, punctuation and whitespace
+LETTER_OFFSET = 0x1000
+LETTER_WEIGHTS = {letter: chr(LETTER_OFFSET + i) for i, letter in enumerate(NORWEGIAN_ALPHABET)}
+
+# Number of sorted entries kept in memory before a run is spilled to disk
+MAX_ENTRIES_IN_MEMORY = 50_000
+
+
+def collation_key(word: str) -> str:
+    """
+    Primary sort key for a headword in Norwegian alphabetical order. Accents are
+    ignored (é sorts as e), while æ, ø and å are separate letters after z.
+    """
+    key = []
+    for char in word.lower():
+        char = FOREIGN_LETTERS.get(char, char)
+        if char not in LETTER_WEIGHTS:
+            # Strip accents, but keep å which would decompose into a + ring
+            char = unicodedata.normalize('NFD', char)[0]
+        key.append(LETTER_WEIGHTS.get(char, char))
+
+    return ''.join(key)
+
+
+def id_collation_key(entry_id) -> str:
+    """ Numeric ids sort numerically, other ids after them."""
+    entry_id = str(entry_id)
+    if entry_id.isdigit():
+        return f"0{int(entry_id):020d}"
+    return f"1{entry_id}"
+
+
+def entry_sort_key(entry: DictionaryEntry) -> str:
+    """
+    Precomputed sort key of an entry: headword in Norwegian order, ties broken by
+    the exact spelling, then part of speech and finally the id.
+    """
+    part_of_speech = VALID_PARTS_OF_SPEECH.index(entry.part_of_speech)
+    return '\0'.join([
+        collation_key(entry.word),
+        entry.word,
+        f"{part_of_speech:02d}",
+        id_collation_key(entry.id),
+    ])
+
+
+def write_run(records: List[Tuple[str, str]], run_dir: Path, run_index: int) -> Path:
+    records.sort(key=itemgetter(0))
+    run_file = run_dir / f"run_{run_index}.jsonl"
+    with open(run_file, 'w', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    return run_file
+
+
+def read_run(run_file: Path) -> Iterator[Tuple[str, str]]:
+    with open(run_file, 'r', encoding='utf-8') as file:
+        for line in file:
+            key, value = json.loads(line)
+            yield key, value
+
+
+def external_sort(records: Iterable[Tuple[str, str]],
+                  max_in_memory: int = MAX_ENTRIES_IN_MEMORY) -> Iterator[Tuple[str, str]]:
+    """
+    Sorts (key, value) records by key. Once more than max_in_memory records are
+    buffered they are written to a sorted run on disk, and the runs are merged
+    lazily while the result is consumed. Records with equal keys keep their
+    input order.
+
+    :param records: Iterable of (sort key, value) string tuples
+    :param max_in_memory: Maximum number of records held in memory while sorting
+    :return: Iterator over the records in sorted order
+    """
+    with tempfile.TemporaryDirectory() as run_dir:
+        run_files = []
+        buffer = []
+        for record in records:
+            buffer.append(record)
+            if len(buffer) >= max_in_memory:
+                run_files.append(write_run(buffer, Path(run_dir), len(run_files)))
+                buffer = []
+
+        buffer.sort(key=itemgetter(0))
+        runs = [read_run(run_file) for run_file in run_files] + [iter(buffer)]
+
+        yield from heapq.merge(*runs, key=itemgetter(0))
@@ -0,0 +1,57 @@
+import re
+
+# Short replacements for the class names used in the Kindle XHTML
+COMPACT_CLASS_NAMES = {
+    "definitions": "ds",
+    "definition-item": "d",
+    "expressions": "es",
+    "expression-item": "e",
+    "expression-definition-item": "ed",
+    "example-list": "xl",
+    "example-item": "x",
+    "inflections-table": "it",
+}
+
+CLASS_ATTRIBUTE_RE = re.compile(r'class="([^"]*)"')
+CSS_CLASS_SELECTOR_RE = re.compile(r'\.([A-Za-z_][\w-]*)')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+WHITESPACE_BETWEEN_TAGS_RE = re.compile(r'>\s+<')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def compact_class_attribute(match):
+    class_names = [COMPACT_CLASS_NAMES.get(name, name) for name in match.group(1).split()]
+    return f'class="{" ".join(class_names)}"'
+
+
+def minify_xhtml(xhtml: str) -> str:
+    """
+    Removes the indentation and newlines between tags, collapses the remaining
+    whitespace and shortens class names according to COMPACT_CLASS_NAMES.
+
+    :param xhtml: XHTML string, e.g. from dictionary_entry_to_xhtml
+    :return: Minified XHTML string
+    """
+    xhtml = WHITESPACE_BETWEEN_TAGS_RE.sub('><', xhtml)
+    xhtml = WHITESPACE_RE.sub(' ', xhtml).strip()
+    xhtml = CLASS_ATTRIBUTE_RE.sub(compact_class_attribute, xhtml)
+
+    return xhtml
+
+
+def compact_css(css: str) -> str:
+    """
+    Rewrites class selectors to the short class names and strips comments and
+    redundant whitespace from the stylesheet.
+
+    :param css: Contents of the source stylesheet
+    :return: Minified stylesheet matching the output of minify_xhtml
+    """
+    css = CSS_COMMENT_RE.sub('', css)
+    css = CSS_CLASS_SELECTOR_RE.sub(
+        lambda match: '.' + COMPACT_CLASS_NAMES.get(match.group(1), match.group(1)), css)
+    css = WHITESPACE_RE.sub(' ', css)
+    css = re.sub(r'\s*([{}:;,])\s*', r'\1', css)
+    css = css.replace(';}', '}')
+
+    return css.strip()
@@ -0,0 +1,257 @@
+import os
+import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from mkdict.parse_html import parse_dictionary_entry
+from mkdict.dict_entry import DictionaryEntry, dictionary_entry_to_xhtml
+from mkdict.compact import minify_xhtml, compact_css
+from mkdict.collation import entry_sort_key, external_sort
+from mkdict.validate import validate_build
+from mkdict.dedup import DedupReport, dedupe_pages, dedupe_entries, save_redirects
+from mkdict.editions import Edition
+
+CONTENT_TEMPLATE_FILE = 'content.template.xhtml'
+CONTENT_FILE = 'content000.xhtml'
+OPF_FILE = 'dict.opf'
+STYLE_FILE = 'styles/style.css'
+
+
+@dataclass
+class KindleSources:
+    """
+    Contents of the Kindle source directory, loaded once and shared by every
+    edition that is compiled.
+    """
+    assets: Dict[str, bytes]
+    content_template: str
+    opf_template: str
+    stylesheet: str
+    compact_stylesheet: str
+
+
+def load_kindle_sources(src_dir: Path) -> KindleSources:
+    src_dir = Path(src_dir)
+    templates = {CONTENT_TEMPLATE_FILE, OPF_FILE, STYLE_FILE}
+    assets = {}
+    for path in sorted(src_dir.rglob('*')):
+        relative_path = path.relative_to(src_dir).as_posix()
+        if path.is_file() and relative_path not in templates:
+            assets[relative_path] = path.read_bytes()
+
+    stylesheet = (src_dir / STYLE_FILE).read_text(encoding='utf-8')
+    return KindleSources(
+        assets=assets,
+        content_template=(src_dir / CONTENT_TEMPLATE_FILE).read_text(encoding='utf-8'),
+        opf_template=(src_dir / OPF_FILE).read_text(encoding='utf-8'),
+        stylesheet=stylesheet,
+        compact_stylesheet=compact_css(stylesheet),
+    )
+
+
+def render_opf(opf_template: str, edition: Edition) -> str:
+    return (opf_template
+            .replace('{{TITLE}}', edition.title)
+            .replace('{{LANGUAGE}}', edition.language)
+            .replace('{{IDENTIFIER}}', f"ordbokene-{edition.code}"))
+
+
+@dataclass
+class StageTimings:
+    """ Number of entries and seconds spent on them for each part of speech, per build stage."""
+    parse_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    parse_times: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    render_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    render_times: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+
+    def pretty_print(self, log=print):
+        for part_of_speech in sorted(self.parse_counts):
+            count, seconds = self.parse_counts[part_of_speech], self.parse_times[part_of_speech]
+            message = (f"{part_of_speech}: {count} entries parsed in {seconds:.2f}s "
+                       f"({count / max(seconds, 1e-9):.1f} entries/s)")
+
+            if self.render_counts[part_of_speech]:
+                count, seconds = self.render_counts[part_of_speech], self.render_times[part_of_speech]
+                message += (f", {count} rendered in {seconds:.2f}s "
+                            f"({count / max(seconds, 1e-9):.1f} entries/s)")
+            log(message)
+
+
+def parse_pages(pages_dir: Path, dedup_report: DedupReport, log,
+                timings: Optional[StageTimings] = None) -> Iterator[DictionaryEntry]:
+    """
+    Parse the unique pages in pages_dir in id order, one entry at a time. Parse
+    times per part of speech are added to timings; without timings they are
+    reported once every page has been parsed.
+    """
+    report_timings = timings is None
+    if report_timings:
+        timings = StageTimings()
+
+    # Get the list of downloaded pages, skipping pages that were downloaded more than once
+    page_files = dedupe_pages(list(pages_dir.iterdir()), dedup_report)
+
+    for page_file in page_files:
+
+        # Parse the dictionary entry from the HTML
+        start = time.perf_counter()
+        try:
+            entry = parse_dictionary_entry(page_file)
+        except Exception as e:
+            log(f"Error parsing entry from {page_file}: {e}")
+            continue
+        timings.parse_times[entry.part_of_speech] += time.perf_counter() - start
+        timings.parse_counts[entry.part_of_speech] += 1
+
+        yield entry
+
+    if report_timings:
+        timings.pretty_print(log)
+
+
+def compile_edition(edition: Edition, pages_dir: Path, build_dir: Path, archive_file: Path,
+                    redirects_file: Path, sources: KindleSources, compact: bool = False) -> bool:
+    """
+    Compiles the downloaded pages of one edition into a Kindle source directory
+    and packages it as a ZIP archive.
+
+    :param edition: Edition being compiled, used for the OPF metadata
+    :param pages_dir: Directory with the downloaded pages of the edition
+    :param build_dir: Directory the Kindle sources are written to, recreated on every run
+    :param archive_file: Path of the ZIP archive
+    :param redirects_file: Path of the JSON file mapping dropped duplicate ids to kept ids
+    :param sources: Shared Kindle sources
+    :param compact: Emit minified XHTML with short class names
+    :return: True if the build passed validation and was packaged
+    """
+    def log(message):
+        print(f"[{edition.code}] {message}")
+
+    # Recreate the destination directory
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    build_dir.mkdir(parents=True)
+
+    # Write the shared assets and the edition's templates to the destination directory
+    for relative_path, data in sources.assets.items():
+        (build_dir / relative_path).parent.mkdir(parents=True, exist_ok=True)
+        (build_dir / relative_path).write_bytes(data)
+    (build_dir / OPF_FILE).write_text(render_opf(sources.opf_template, edition), encoding='utf-8')
+    (build_dir / STYLE_FILE).parent.mkdir(parents=True, exist_ok=True)
+    (build_dir / STYLE_FILE).write_text(
+        sources.compact_stylesheet if compact else sources.stylesheet, encoding='utf-8')
+
+    # Parse, deduplicate and render the entries one at a time, so only the
+    # external sort buffer holds entries in memory
+    dedup_report = DedupReport()
+    timings = StageTimings()
+    parsed_dict_entries = dedupe_entries(parse_pages(pages_dir, dedup_report, log, timings), dedup_report)
+
+    sizes = {'before': 0, 'after': 0}
+
+    def render_entries():
+        for entry in parsed_dict_entries:
+            # Time rendering per part of speech, tables come from INFLECTION_TABLE_RENDERERS
+            start = time.perf_counter()
+            xhtml = dictionary_entry_to_xhtml(entry)
+            timings.render_times[entry.part_of_speech] += time.perf_counter() - start
+            timings.render_counts[entry.part_of_speech] += 1
+            if compact:
+                sizes['before'] += len(xhtml.encode('utf-8'))
+                xhtml = minify_xhtml(xhtml)
+                sizes['after'] += len(xhtml.encode('utf-8'))
+            yield entry_sort_key(entry), xhtml
+
+    content_head, content_tail = sources.content_template.split('{{ENTRIES}}')
+
+    # Generate the content file
+    # Stream the entries sorted by headword into the placeholder and add <hr/> between entries
+    with open(build_dir / CONTENT_FILE, 'w', encoding='utf-8') as f:
+        f.write(content_head)
+        for i, (_, xhtml) in enumerate(external_sort(render_entries())):
+            if i > 0:
+                f.write('<hr/>')
+            f.write(xhtml)
+        f.write(content_tail)
+
+    # The report is complete now that every entry has been streamed
+    # Report parse and render throughput for each part of speech
+    timings.pretty_print(log)
+    dedup_report.pretty_print(log)
+    save_redirects(dedup_report.redirects, redirects_file)
+
+    if compact:
+        log(f"Compact entries: {sizes['before']} -> {sizes['after']} bytes "
+            f"({100 * (1 - sizes['after'] / max(sizes['before'], 1)):.1f}% smaller)")
+
+    return package_build(build_dir, archive_file, log)
+
+
+def package_build(build_dir: Path, archive_file: Path, log=print) -> bool:
+    """
+    Validates a compiled Kindle source directory and packages it as a ZIP archive.
+
+    :param build_dir: Directory with the compiled dictionary
+    :param archive_file: Path of the ZIP archive
+    :param log: Function used to report progress
+    :return: True if the build passed validation and was packaged
+    """
+    # Validate the build before packaging it
+    start = time.perf_counter()
+    validation_errors = validate_build(build_dir)
+    log(f"Validated {build_dir} in {time.perf_counter() - start:.2f}s")
+    if validation_errors:
+        for error in validation_errors:
+            log(f"Validation error: {error}")
+        return False
+
+    # Create the final ZIP file
+    archive_file = Path(archive_file).resolve()
+    if archive_file.exists():
+        archive_file.unlink()
+    os.system(f'cd {build_dir} && zip -qr {archive_file} .')
+    log(f"Packaged {archive_file.name}")
+
+    return True
+
+
+def archive_path(build_root: Path, edition: Edition) -> Path:
+    return Path(build_root).parent / f"kindle_dictionary_{edition.code}.zip"
+
+
+def redirects_path(build_root: Path, edition: Edition) -> Path:
+    return Path(build_root).parent / f"kindle_redirects_{edition.code}.json"
+
+
+def compile_editions(editions: List[Edition], pages_root: Path, build_root: Path, sources: KindleSources,
+                     compact: bool = False) -> bool:
+    """
+    Compiles several editions in parallel, one process per edition. Each edition
+    reads pages_root/<code>/ and is packaged as kindle_dictionary_<code>.zip next
+    to build_root.
+
+    :return: True if every edition was packaged
+    """
+    pages_root, build_root = Path(pages_root), Path(build_root)
+    jobs = [
+        (edition,
+         pages_root / edition.code,
+         build_root / edition.code,
+         archive_path(build_root, edition),
+         redirects_path(build_root, edition),
+         sources,
+         compact)
+        for edition in editions
+    ]
+
+    if len(jobs) == 1:
+        return compile_edition(*jobs[0])
+
+    with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+        results = list(executor.map(compile_edition, *zip(*jobs)))
+
+    return all(results)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from mkdict.dict_entry import DictionaryEntry, dictionary_entry_to_xhtml
+
+
+@dataclass
+class DedupReport:
+    pages_dropped: int = 0
+    page_bytes_saved: int = 0
+    entries_dropped: int = 0
+    definitions_merged: int = 0
+    entry_bytes_saved: int = 0
+    # Maps the id of every dropped page or entry to the id that replaces it
+    redirects: Dict[str, str] = field(default_factory=dict)
+
+    def pretty_print(self, log=print):
+        log(f"Duplicate pages dropped: {self.pages_dropped} ({self.page_bytes_saved} bytes of HTML)")
+        log(f"Duplicate entries dropped: {self.entries_dropped}")
+        log(f"Homograph definitions merged: {self.definitions_merged}")
+        log(f"XHTML bytes saved: {self.entry_bytes_saved}")
+
+
+def page_id(page_file: Path) -> str:
+    # file name is in the form "page_{id}.html"
+    return str(page_file.name).split('.')[0].split('_')[-1]
+
+
+def id_sort_key(entry_id: str):
+    """ Order numeric ids numerically and put any other ids after them."""
+    entry_id = str(entry_id)
+    if entry_id.isdigit():
+        return 0, int(entry_id), ''
+    return 1, 0, entry_id
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def page_fingerprint(html_content: str) -> str:
+    """ Fingerprint of the article with all whitespace normalized away."""
+    return fingerprint(' '.join(html_content.split()))
+
+
+def entry_fingerprint(entry: DictionaryEntry) -> str:
+    """ Fingerprint of everything in the entry except its id."""
+    content = asdict(entry)
+    content.pop('id')
+    return fingerprint(json.dumps(content, sort_keys=True, ensure_ascii=False))
+
+
+def definition_fingerprint(definition) -> str:
+    return fingerprint(json.dumps(asdict(definition), sort_keys=True, ensure_ascii=False))
+
+
+def resolve_redirect(redirects: Dict[str, str], entry_id: str) -> str:
+    """ Follow the redirect chain to the id that survived deduplication."""
+    while entry_id in redirects:
+        entry_id = redirects[entry_id]
+    return entry_id
+
+
+def dedupe_pages(page_files: List[Path], report: DedupReport) -> List[Path]:
+    """
+    Drop pages whose article content is identical to a page with a lower id.
+
+    :param page_files: Paths to the downloaded "page_{id}.html" files
+    :param report: DedupReport that is updated with the dropped pages
+    :return: The page files to parse
+    """
+    kept = []
+    survivors = {}
+
+    for page_file in sorted(page_files, key=lambda path: id_sort_key(page_id(path))):
+        with open(page_file, 'r', encoding='utf-8') as file:
+            html_content = file.read()
+
+        key = page_fingerprint(html_content)
+        if key in survivors:
+            report.redirects[page_id(page_file)] = survivors[key]
+            report.pages_dropped += 1
+            report.page_bytes_saved += len(html_content.encode('utf-8'))
+            continue
+
+        survivors[key] = page_id(page_file)
+        kept.append(page_file)
+
+    return kept
+
+
+def dedupe_entries(entries: Iterable[DictionaryEntry], report: DedupReport) -> Iterator[DictionaryEntry]:
+    """
+    Collapse entries that are identical apart from their id, and remove definitions
+    from homographs (same word and part of speech) that repeat a definition of
+    an earlier homograph. A homograph left without definitions or expressions is
+    dropped and redirected to the first homograph.
+
+    Entries are streamed: only fingerprints and ids are kept, so the entries must
+    arrive in id order (as parse_pages yields them) for the lowest id to survive.
+    The report is complete once the iterator is exhausted.
+
+    :param entries: Parsed DictionaryEntry instances, in id order
+    :param report: DedupReport that is updated with the dropped entries
+    :return: Iterator over the remaining entries
+    """
+    survivors: Dict[str, str] = {}
+    # Definitions already emitted for each (word, part of speech)
+    homograph_definitions: Dict[Tuple[str, str], Set[str]] = {}
+    homograph_first_id: Dict[Tuple[str, str], str] = {}
+
+    for entry in entries:
+        key = entry_fingerprint(entry)
+        if key in survivors:
+            report.redirects[str(entry.id)] = survivors[key]
+            report.entries_dropped += 1
+            report.entry_bytes_saved += len(dictionary_entry_to_xhtml(entry).encode('utf-8'))
+            continue
+        survivors[key] = str(entry.id)
+
+        homograph = (entry.word, entry.part_of_speech)
+        seen_definitions = homograph_definitions.setdefault(homograph, set())
+        homograph_first_id.setdefault(homograph, str(entry.id))
+
+        unique_definitions = []
+        for definition in entry.definitions:
+            definition_key = definition_fingerprint(definition)
+            if definition_key not in seen_definitions:
+                seen_definitions.add(definition_key)
+                unique_definitions.append(definition)
+
+        if len(unique_definitions) != len(entry.definitions):
+            size_before = len(dictionary_entry_to_xhtml(entry).encode('utf-8'))
+            report.definitions_merged += len(entry.definitions) - len(unique_definitions)
+            entry.definitions = unique_definitions
+
+            if not entry.definitions and not entry.expressions:
+                report.redirects[str(entry.id)] = homograph_first_id[homograph]
+                report.entries_dropped += 1
+                report.entry_bytes_saved += size_before
+                continue
+
+            report.entry_bytes_saved += size_before - len(dictionary_entry_to_xhtml(entry).encode('utf-8'))
+
+        yield entry
+
+
+def save_redirects(redirects: Dict[str, str], file_path: Path) -> None:
+    """ Save the redirect map with every chain resolved to its final id."""
+    resolved = {dropped: resolve_redirect(redirects, dropped) for dropped in redirects}
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump(resolved, file, indent=2, sort_keys=True, ensure_ascii=False)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import List, Optional, Any, Tuple, Dict
+from xml.sax.saxutils import escape, quoteattr
 
 VALID_PARTS_OF_SPEECH = [
     "verb", "substantiv", "adjektiv", "determinativ",
@@ -75,9 +76,10 @@ class AdjectiveInflections(Inflections):
     entall_intetkjonn: str
     bestempt_form: str
     flertall: str
-    komparativ: str
-    superlativ_ubestemt_form: str
-    superlativ_bestemt_form: str
+    # Not every adjective has a degree (gradbøying) table
+    komparativ: Optional[str] = None
+    superlativ_ubestemt_form: Optional[str] = None
+    superlativ_bestemt_form: Optional[str] = None
 
 
 @dataclass
@@ -154,9 +156,27 @@ def dictionary_entry_to_html(entry: DictionaryEntry, css_file_path='dictionary_s
         <title>{entry.word}</title>
     </head>
     <body>
-        <h1 class="word-title">{entry.word} <span class="part-of-speech">({entry.part_of_speech})</span></h1>
     '''
 
+    html += dictionary_entry_to_html_body(entry)
+
+    html += '''
+    </body>
+    </html>
+    '''
+
+    return html
+
+
+def dictionary_entry_to_html_body(entry: DictionaryEntry) -> str:
+    """
+    Converts a DictionaryEntry instance to the HTML that goes inside the <body> tag.
+
+    :param entry: DictionaryEntry instance
+    :return: A string containing HTML representation of the entry
+    """
+    html = f'<h1 class="word-title">{entry.word} <span class="part-of-speech">({entry.part_of_speech})</span></h1>'
+
     # Adding gender if available
     if entry.gender:
         html += f'<div class="gender"><strong>Gender:</strong> {entry.gender}</div>'
@@ -195,17 +215,13 @@ def dictionary_entry_to_html(entry: DictionaryEntry, css_file_path='dictionary_s
             html += '</ul></li>'
         html += '</ul></div>'
 
-    html += '''
-    </body>
-    </html>
-    '''
-
     return html
 
 
 def dictionary_entry_to_xhtml(entry: DictionaryEntry) -> str:
     """
     Generates XHTML content for a Kindle dictionary entry, to be included inside a <mbp:frameset> tag.
+    Scraped text is escaped, so the entry stays well-formed whatever characters it contains.
 
     :param entry: DictionaryEntry instance
     :return: A string containing XHTML representation of the entry
@@ -213,8 +229,8 @@ def dictionary_entry_to_xhtml(entry: DictionaryEntry) -> str:
     # Initialize the XHTML for the dictionary entry
     xhtml = f'''
         <idx:entry name="default" scriptable="yes" spell="yes">
-            <idx:short><a id="{entry.id}"></a>
-                <idx:orth value="{entry.word}">
+            <idx:short><a id={quoteattr(str(entry.id))}></a>
+                <idx:orth value={quoteattr(entry.word)}>
                     {generate_headword(entry)}
                     {generate_inflections(entry)}
                 </idx:orth>
@@ -229,28 +245,28 @@ def dictionary_entry_to_xhtml(entry: DictionaryEntry) -> str:
     #     xhtml += '</ul></div>'
 
     if entry.inflections:
-        xhtml += generate_inflections_tables_verb(entry)
+        xhtml += generate_inflections_tables(entry)
 
     # Adding definitions and examples
     xhtml += '<div class="definitions"><ol>'
     for definition in entry.definitions:
-        xhtml += f'<li class="definition-item">{"; ".join(definition.definition)}</li>'
+        xhtml += f'<li class="definition-item">{escape("; ".join(definition.definition))}</li>'
         if definition.examples:
             for example in definition.examples:
-                xhtml += f'<span class="example-item">{example}</span>'
+                xhtml += f'<span class="example-item">{escape(example)}</span>'
     xhtml += '</ol></div>'
 
     # Adding expressions
     if entry.expressions:
         xhtml += '<div class="expressions"><strong>Expressions</strong><ul>'
         for expression in entry.expressions:
-            xhtml += f'<li class="expression-item"><strong>{expression.expression}</strong><ul>'
+            xhtml += f'<li class="expression-item"><strong>{escape(expression.expression)}</strong><ul>'
             for definition in expression.definitions:
-                xhtml += f'<li class="expression-definition-item">{", ".join(definition.definition)}</li>'
+                xhtml += f'<li class="expression-definition-item">{escape(", ".join(definition.definition))}</li>'
                 if definition.examples:
                     xhtml += '<ul class="example-list">'
                     for example in definition.examples:
-                        xhtml += f'<li class="example-item">{example}</li>'
+                        xhtml += f'<li class="example-item">{escape(example)}</li>'
                     xhtml += '</ul>'
             xhtml += '</ul></li>'
         xhtml += '</ul></div>'
@@ -270,9 +286,9 @@ def generate_headword(entry):
     :param entry: DictionaryEntry instance
     :return: A string containing headword XHTML
     """
-    headword = f"<b>{entry.word}</b> {entry.part_of_speech}"
+    headword = f"<b>{escape(entry.word)}</b> {entry.part_of_speech}"
     if entry.gender:
-        headword += f" ({entry.gender})"
+        headword += f" ({escape(entry.gender)})"
 
     return headword
 
@@ -293,39 +309,133 @@ def generate_inflections(entry):
     # include name of the inflection as well
     for attr, value in vars(entry.inflections).items():
         if not attr.startswith("_") and value:
-            inflections_xhtml += f'<idx:iform name="{attr.replace("_", " ")}" value="{value}"></idx:iform>'
+            inflections_xhtml += f'<idx:iform name="{attr.replace("_", " ")}" value={quoteattr(value)}></idx:iform>'
     inflections_xhtml += '</idx:infl>'
 
     return inflections_xhtml
 
 
+def generate_inflections_table(forms):
+    """
+    Generates a single inflection table XHTML from (name, value) pairs.
+    Forms without a value are left out.
+
+    :param forms: List of (form name, inflected form) tuples
+    :return: A string containing inflection table XHTML
+    """
+    forms = [(name, value) for name, value in forms if value]
+    if not forms:
+        return ''
+
+    table = '<table class="inflections-table"><thead><tr>'
+    for name, _ in forms:
+        table += f'<th>{escape(name)}</th>'
+    table += '</tr></thead><tbody><tr>'
+    for _, value in forms:
+        table += f'<td>{escape(value)}</td>'
+    table += '</tr></tbody></table>'
+
+    return table
+
+
 def generate_inflections_tables_verb(entry):
     """
-    Generates inflection table XHTML for the given entry.
+    Generates inflection table XHTML for a verb entry.
 
     :param entry: DictionaryEntry instance
     :return: A string containing inflection table XHTML
     """
-    if not entry.inflections:
-        return ''
+    inflections = entry.inflections
+    return generate_inflections_table([
+        ('infinitiv', inflections.infinitiv),
+        ('presens', inflections.presens),
+        ('preteritum', inflections.preteritum),
+        ('presens perfektum', inflections.presens_perfektum),
+        ('imperativ', inflections.imperativ),
+    ])
+
+
+def generate_inflections_tables_noun(entry):
+    """
+    Generates inflection table XHTML for a noun entry.
+
+    :param entry: DictionaryEntry instance
+    :return: A string containing inflection table XHTML
+    """
+    inflections = entry.inflections
+    return generate_inflections_table([
+        ('entall ubestemt form', inflections.entall_ubestemt_form),
+        ('entall bestemt form', inflections.entall_bestemt_form),
+        ('flertall ubestemt form', inflections.flertall_ubestemt_form),
+        ('flertall bestemt form', inflections.flertall_bestemt_form),
+    ])
+
+
+def generate_inflections_tables_adjective(entry):
+    """
+    Generates inflection table XHTML for an adjective entry, followed by
+    the degree table if the adjective has one.
+
+    :param entry: DictionaryEntry instance
+    :return: A string containing inflection table XHTML
+    """
+    inflections = entry.inflections
+    tables = generate_inflections_table([
+        ('hankjønn / hunkjønn', inflections.entall_hankjonn),
+        ('intetkjønn', inflections.entall_intetkjonn),
+        ('bestemt form', inflections.bestempt_form),
+        ('flertall', inflections.flertall),
+    ])
+    tables += generate_inflections_table([
+        ('komparativ', inflections.komparativ),
+        ('superlativ ubestemt form', inflections.superlativ_ubestemt_form),
+        ('superlativ bestemt form', inflections.superlativ_bestemt_form),
+    ])
+
+    return tables
+
+
+def generate_inflections_tables_determinative(entry):
+    """
+    Generates inflection table XHTML for a determinative entry.
+
+    :param entry: DictionaryEntry instance
+    :return: A string containing inflection table XHTML
+    """
+    inflections = entry.inflections
+    return generate_inflections_table([
+        ('hankjønn', inflections.entall_hankjonn),
+        ('hunkjønn', inflections.entall_hunkjonn),
+        ('intetkjønn', inflections.entall_intetkjonn),
+        ('flertall', inflections.flertall),
+    ])
+
 
-    inflections_xhtml = '<table class="inflections-table">'
+# Table renderer for each part of speech that has inflections
+INFLECTION_TABLE_RENDERERS = {
+    "verb": generate_inflections_tables_verb,
+    "substantiv": generate_inflections_tables_noun,
+    "adjektiv": generate_inflections_tables_adjective,
+    "determinativ": generate_inflections_tables_determinative,
+}
 
-    basic_inflections = ['infinitiv', 'presens', 'preteritum', 'presens perfektum']
-    basic_inflections_table = inflections_xhtml + '<thead><tr>'
-    for inflection in basic_inflections:
-        basic_inflections_table += f'<th>{inflection}</th>'
-    if entry.inflections.imperativ:
-        basic_inflections_table += '<th>imperativ</th>'
-    basic_inflections_table += '</tr></thead><tbody><tr>'
 
-    for inflection in basic_inflections:
-        basic_inflections_table += f'<td>{entry.inflections.infinitiv}</td>'
-    if entry.inflections.imperativ:
-        basic_inflections_table += f'<td>{entry.inflections.imperativ}</td>'
-    basic_inflections_table += '</tr></tbody></table>'
+def generate_inflections_tables(entry):
+    """
+    Generates inflection table XHTML for the given entry using the renderer
+    registered for its part of speech.
+
+    :param entry: DictionaryEntry instance
+    :return: A string containing inflection table XHTML
+    """
+    if not entry.inflections:
+        return ''
+
+    renderer = INFLECTION_TABLE_RENDERERS.get(entry.part_of_speech)
+    if renderer is None:
+        return ''
 
-    return basic_inflections_table
+    return renderer(entry)
 
 
 # def generate_definitions(entry):
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Edition:
+    code: str
+    title: str
+    language: str
+
+    @property
+    def url_base(self) -> str:
+        return f"https://ordbokene.no/{self.code}/{{}}"
+
+
+EDITIONS = {
+    "bm": Edition("bm", "Ordbøkene – Bokmål", "nb"),
+    "nn": Edition("nn", "Ordbøkene – Nynorsk", "nn"),
+}
+DEFAULT_EDITION = "bm"
@@ -0,0 +1,165 @@
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Iterable
+
+from mkdict.dict_entry import DictionaryEntry, dictionary_entry_to_xhtml
+
+# Index file layout:
+#   header
+#   key records, sorted by the UTF-8 bytes of the form
+#   entry records
+#   key blob (the forms)
+#   entry blob (the rendered entries)
+MAGIC = b'MKDX'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIQQ')  # magic, version, keys, entries, key blob start, entry blob start
+KEY_RECORD = struct.Struct('<IHIB')  # key offset, key length, entry index, kind
+ENTRY_RECORD = struct.Struct('<II')  # entry offset, entry length
+
+HEADWORD = 0
+INFLECTION = 1
+KIND_NAMES = {HEADWORD: 'headword', INFLECTION: 'inflection'}
+
+
+@dataclass
+class LookupResult:
+    form: str
+    kind: str
+    entry: str
+
+
+def entry_forms(entry: DictionaryEntry):
+    """ Yield (form, kind) for the headword and every inflected form of the entry."""
+    yield entry.word, HEADWORD
+    if entry.inflections:
+        for attr, value in vars(entry.inflections).items():
+            if not attr.startswith("_") and value:
+                yield value, INFLECTION
+
+
+def build_lookup_index(entries: Iterable[DictionaryEntry], file_path: Path) -> int:
+    """
+    Builds the lookup index over headwords and inflected forms and saves it as a
+    single file that LookupIndex memory-maps.
+
+    :param entries: DictionaryEntry instances to index
+    :param file_path: Path of the index file
+    :return: Number of indexed forms
+    """
+    keys = set()
+    rendered_entries = []
+    for entry_index, entry in enumerate(entries):
+        rendered_entries.append(dictionary_entry_to_xhtml(entry).encode('utf-8'))
+        headword = entry.word.lower()
+        for form, kind in entry_forms(entry):
+            # A form that equals the headword is already indexed as the headword
+            if kind == INFLECTION and form.lower() == headword:
+                continue
+            keys.add((form.lower().encode('utf-8'), entry_index, kind))
+
+    keys = sorted(keys)
+
+    key_records = bytearray()
+    key_blob = bytearray()
+    for form, entry_index, kind in keys:
+        key_records += KEY_RECORD.pack(len(key_blob), len(form), entry_index, kind)
+        key_blob += form
+
+    entry_records = bytearray()
+    entry_blob = bytearray()
+    for rendered in rendered_entries:
+        entry_records += ENTRY_RECORD.pack(len(entry_blob), len(rendered))
+        entry_blob += rendered
+
+    key_blob_start = HEADER.size + len(key_records) + len(entry_records)
+    entry_blob_start = key_blob_start + len(key_blob)
+    with open(file_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(keys), len(rendered_entries),
+                               key_blob_start, entry_blob_start))
+        file.write(key_records)
+        file.write(entry_records)
+        file.write(key_blob)
+        file.write(entry_blob)
+
+    return len(keys)
+
+
+class LookupIndex:
+    """
+    Read-only view of an index file written by build_lookup_index. The file is
+    memory-mapped, lookups binary search the sorted key records directly.
+    """
+
+    def __init__(self, file_path: Path):
+        self.file = open(file_path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.n_keys, self.n_entries, self.key_blob_start, self.entry_blob_start = \
+            HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{file_path} is not a version {VERSION} lookup index.")
+        self.entry_records_start = HEADER.size + self.n_keys * KEY_RECORD.size
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def key_record(self, i):
+        return KEY_RECORD.unpack_from(self.data, HEADER.size + i * KEY_RECORD.size)
+
+    def key(self, i) -> bytes:
+        key_offset, key_length, _, _ = self.key_record(i)
+        start = self.key_blob_start + key_offset
+        return self.data[start:start + key_length]
+
+    def entry(self, entry_index) -> str:
+        offset, length = ENTRY_RECORD.unpack_from(
+            self.data, self.entry_records_start + entry_index * ENTRY_RECORD.size)
+        start = self.entry_blob_start + offset
+        return self.data[start:start + length].decode('utf-8')
+
+    def lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def result(self, i) -> LookupResult:
+        _, _, entry_index, kind = self.key_record(i)
+        return LookupResult(self.key(i).decode('utf-8'), KIND_NAMES[kind], self.entry(entry_index))
+
+    def exact(self, word: str) -> List[LookupResult]:
+        """ Entries with the word as headword or inflected form, headwords first."""
+        key = word.lower().encode('utf-8')
+        results = []
+        i = self.lower_bound(key)
+        while i < self.n_keys and self.key(i) == key:
+            results.append(self.result(i))
+            i += 1
+        return sorted(results, key=lambda result: result.kind != 'headword')
+
+    def inflected(self, word: str) -> List[LookupResult]:
+        """ Entries with the word as one of their inflected forms."""
+        return [result for result in self.exact(word) if result.kind == 'inflection']
+
+    def prefix(self, prefix: str, limit: int = 20) -> List[LookupResult]:
+        """ Entries with a headword or inflected form starting with the prefix."""
+        key = prefix.lower().encode('utf-8')
+        results = []
+        i = self.lower_bound(key)
+        while i < self.n_keys and len(results) < limit and self.key(i).startswith(key):
+            results.append(self.result(i))
+            i += 1
+        return results
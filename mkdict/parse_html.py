@@ -2,7 +2,8 @@ from pathlib import Path
 
 from bs4 import BeautifulSoup
 from mkdict.dict_entry import (
-    VerbInflections, Definition, Expression, DictionaryEntry,
+    VerbInflections, NounInflections, AdjectiveInflections, DeterminativeInflections,
+    Definition, Expression, DictionaryEntry,
 )
 
 # Define a custom exception for parsing errors
@@ -23,7 +24,7 @@ def extract_word_and_pos(soup):
         raise ParseError('Part of speech span not found in the HTML snippet')
 
     extracted = subheader.extract()
-    part_of_speech = extracted.get_text(strip=True)
+    part_of_speech = extracted.get_text(strip=True, separator=' ')
 
     # Now get_text() will not include part of speech for the word
     word = word_span.get_text(separator=' ', strip=True)
@@ -36,6 +37,21 @@ def extract_word_and_pos(soup):
     return word, part_of_speech
 
 
+def split_part_of_speech(header_text):
+    """
+    Split the subheader text into part of speech and gender.
+    For nouns the header reads e.g. "substantiv hankjønn". Other parts of speech
+    have no gender, any qualifier after them (e.g. "determinativ possessiv") is dropped.
+    """
+    parts = header_text.lower().split(' ', 1)
+    part_of_speech = parts[0]
+    gender = None
+    if part_of_speech == 'substantiv' and len(parts) > 1:
+        gender = parts[1].strip()
+
+    return part_of_speech, gender
+
+
 # def flatten_table_headers(header_rows):
 #     """
 #     Flatten table headers from two rows, taking into account colspan and rowspan attributes.
@@ -212,6 +228,123 @@ def extract_verb_inflections(soup):
     return verb_inflections
 
 
+def parse_inflection_cells(table):
+    """ Return the cleaned inflected forms from the last row of an inflection table."""
+    rows = table.find_all('tr')
+    # Exclude empty rows
+    rows = [row for row in rows if not is_empty_row(row)]
+    if not rows:
+        raise ParseError('Inflection table has no rows.')
+
+    forms = []
+    for cell in rows[-1].find_all('td'):
+        form = cell.get_text(strip=True, separator=' ')
+        form = form.split('+')[0].strip()  # Removing contextual info if present
+        forms.append(form)
+
+    return forms
+
+
+# Bokmål and Nynorsk indefinite articles
+NOUN_ARTICLES = ('en/ei', 'ei/en', 'ein/ei', 'ei/ein', 'en', 'ein', 'ei', 'et', 'eit')
+
+
+def strip_noun_article(form):
+    """ Remove the indefinite article the noun table puts in front of the singular form."""
+    for article in NOUN_ARTICLES:
+        if form.startswith(article + ' '):
+            return form[len(article) + 1:].strip()
+    return form
+
+
+def extract_noun_inflections(soup):
+
+    table = soup.find('table')
+    forms = parse_inflection_cells(table)
+    if len(forms) != 4:
+        raise ParseError(f'Unexpected number of cells in the noun table ({len(forms)}). Expected 4.')
+
+    # Cells are ordered: entall ubestemt, entall bestemt, flertall ubestemt, flertall bestemt
+    return NounInflections(
+        entall_ubestemt_form=strip_noun_article(forms[0]),
+        entall_bestemt_form=forms[1],
+        flertall_ubestemt_form=forms[2],
+        flertall_bestemt_form=forms[3],
+    )
+
+
+def extract_adjective_inflections(soup):
+
+    tables = soup.find_all('table')[:2]  # Inflection table and optional degree table
+
+    forms = parse_inflection_cells(tables[0])
+    if len(forms) != 4:
+        raise ParseError(f'Unexpected number of cells in the adjective table ({len(forms)}). Expected 4.')
+
+    # Cells are ordered: hankjønn/hunkjønn, intetkjønn, bestemt form, flertall
+    adjective_forms = {
+        'entall_hankjonn': forms[0],
+        'entall_intetkjonn': forms[1],
+        'bestempt_form': forms[2],
+        'flertall': forms[3],
+    }
+
+    if len(tables) > 1:
+        degree_forms = parse_inflection_cells(tables[1])
+        if len(degree_forms) != 3:
+            raise ParseError(f'Unexpected number of cells in the degree table ({len(degree_forms)}). Expected 3.')
+
+        # Cells are ordered: komparativ, superlativ ubestemt, superlativ bestemt
+        adjective_forms['komparativ'] = degree_forms[0]
+        adjective_forms['superlativ_ubestemt_form'] = degree_forms[1]
+        adjective_forms['superlativ_bestemt_form'] = degree_forms[2]
+
+    return AdjectiveInflections(**adjective_forms)
+
+
+def extract_determinative_inflections(soup):
+
+    table = soup.find('table')
+    forms = parse_inflection_cells(table)
+
+    if len(forms) == 3:
+        # Hankjønn and hunkjønn share a column
+        forms = [forms[0]] + forms
+    if len(forms) != 4:
+        raise ParseError(f'Unexpected number of cells in the determinative table ({len(forms)}). Expected 3 or 4.')
+
+    # Cells are ordered: hankjønn, hunkjønn, intetkjønn, flertall
+    return DeterminativeInflections(
+        entall_hankjonn=forms[0],
+        entall_hunkjonn=forms[1],
+        entall_intetkjonn=forms[2],
+        flertall=forms[3],
+    )
+
+
+# Inflection table parser for each part of speech, the other parts of speech
+# are not inflected and their pages are never searched for tables
+INFLECTION_PARSERS = {
+    'verb': extract_verb_inflections,
+    'substantiv': extract_noun_inflections,
+    'adjektiv': extract_adjective_inflections,
+    'determinativ': extract_determinative_inflections,
+}
+
+
+def extract_inflections(soup, part_of_speech):
+    """ Run the inflection parser registered for the part of speech, if any."""
+    parser = INFLECTION_PARSERS.get(part_of_speech)
+    if parser is None:
+        return None
+
+    # Some inflected words, e.g. loan words, have no inflection table
+    if not soup.find('table'):
+        return None
+
+    return parser(soup)
+
+
 def parse_definitions(soup):
 
     section = soup.select_one('section.definitions')
@@ -354,10 +487,11 @@ def parse_dictionary_entry(file_path: str):
 
     soup = BeautifulSoup(html_content, 'html.parser')
 
-    word, part_of_speech = extract_word_and_pos(soup)
+    word, header_text = extract_word_and_pos(soup)
+    part_of_speech, gender = split_part_of_speech(header_text)
 
-    # Example usage with HTML content
-    verb_inflections_instance = extract_verb_inflections(soup)
+    # Only the table parser matching the part of speech is run
+    inflections = extract_inflections(soup, part_of_speech)
 
     # Extract definitions and examples
     definitions = parse_definitions(soup)
@@ -368,7 +502,8 @@ def parse_dictionary_entry(file_path: str):
         word,
         part_of_speech,
         definitions,
-        inflections=verb_inflections_instance,
+        gender=gender,
+        inflections=inflections,
         expressions=expressions
         )
 
@@ -0,0 +1,161 @@
+import asyncio
+import html
+from http import HTTPStatus
+import threading
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote
+
+from mkdict.parse_html import parse_dictionary_entry
+from mkdict.dict_entry import dictionary_entry_to_html, dictionary_entry_to_xhtml
+
+# Number of parsed entries and rendered pages kept in memory
+CACHE_SIZE = 4096
+CONTENT_TEMPLATE_FILE = 'content.template.xhtml'
+CONTENT_TYPES = {
+    '.css': 'text/css',
+    '.jpg': 'image/jpeg',
+    '.html': 'text/html; charset=utf-8',
+}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_cached(page_file: str, mtime_ns: int):
+    # The modification time is part of the cache key, so an edited page is parsed again
+    return parse_dictionary_entry(page_file)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def render_cached(page_file: str, mtime_ns: int, kindle: bool, template: str) -> str:
+    entry = parse_cached(page_file, mtime_ns)
+    if kindle:
+        return template.replace('{{ENTRIES}}', dictionary_entry_to_xhtml(entry))
+    return dictionary_entry_to_html(entry, css_file_path='/styles/style.css')
+
+
+class PreviewServer:
+    """
+    Serves previews of downloaded pages:
+        /                      list of downloaded pages
+        /entry/<id>            entry rendered with dictionary_entry_to_html
+        /entry/<id>/kindle     entry rendered with dictionary_entry_to_xhtml
+        /word/<headword>       entry with the headword rendered as /entry/<id>,
+                               or a list of the homographs
+        /word/<headword>/kindle  same, rendered as /entry/<id>/kindle
+        /styles/..., /images/...  assets from the Kindle source directory
+    """
+
+    def __init__(self, pages_dir: Path, src_dir: Path):
+        self.pages_dir = Path(pages_dir)
+        self.src_dir = Path(src_dir)
+        with open(self.src_dir / CONTENT_TEMPLATE_FILE, 'r', encoding='utf-8') as f:
+            # Serve assets from the root rather than relative to /entry/<id>/
+            self.template = f.read().replace('href="styles/', 'href="/styles/')
+        # Headword -> page files, rebuilt when a page is added, removed or changed
+        self.headwords = {}
+        self.headwords_snapshot = None
+        # Worker threads share the map, only one of them rebuilds it
+        self.headwords_lock = threading.Lock()
+
+    def page_file(self, entry_id: str) -> Path:
+        page_file = self.pages_dir / f"page_{entry_id}.html"
+        if not page_file.is_file():
+            raise FileNotFoundError(entry_id)
+        return page_file
+
+    def render(self, page_file: Path, kindle: bool) -> str:
+        return render_cached(str(page_file), page_file.stat().st_mtime_ns, kindle, self.template)
+
+    def find_headword(self, word: str):
+        with self.headwords_lock:
+            # Page file -> modification time, a page overwritten in place changes its own mtime
+            # but not the mtime of the directory
+            snapshot = {page_file: page_file.stat().st_mtime_ns
+                        for page_file in sorted(self.pages_dir.glob('page_*.html'))}
+            if snapshot != self.headwords_snapshot:
+                headwords = {}
+                for page_file, mtime_ns in snapshot.items():
+                    try:
+                        entry = parse_cached(str(page_file), mtime_ns)
+                    except Exception as e:
+                        print(f"Error parsing entry from {page_file}: {e}")
+                        continue
+                    headwords.setdefault(entry.word, []).append(page_file)
+                self.headwords, self.headwords_snapshot = headwords, snapshot
+
+            return self.headwords.get(word.lower(), [])
+
+    def index_page(self, page_files=None) -> str:
+        if page_files is None:
+            page_files = sorted(self.pages_dir.glob('page_*.html'))
+
+        links = []
+        for page_file in page_files:
+            entry_id = html.escape(page_file.stem.split('_')[-1])
+            links.append(f'<li><a href="/entry/{entry_id}">{entry_id}</a> '
+                         f'(<a href="/entry/{entry_id}/kindle">kindle</a>)</li>')
+        return f'<!DOCTYPE html><html><body><ul>{"".join(links)}</ul></body></html>'
+
+    def handle(self, path: str):
+        """ Return (status, content type, body) for a request path. Runs in a worker thread."""
+        parts = [unquote(part) for part in path.split('?')[0].split('/') if part]
+
+        if not parts:
+            return 200, CONTENT_TYPES['.html'], self.index_page().encode('utf-8')
+
+        if parts[0] in ('styles', 'images'):
+            asset = (self.src_dir / '/'.join(parts)).resolve()
+            if self.src_dir.resolve() in asset.parents and asset.is_file():
+                return 200, CONTENT_TYPES.get(asset.suffix, 'application/octet-stream'), asset.read_bytes()
+
+        elif parts[0] in ('entry', 'word') and (len(parts) == 2 or (len(parts) == 3 and parts[2] == 'kindle')):
+            kindle = len(parts) == 3
+            if parts[0] == 'entry':
+                try:
+                    page_files = [self.page_file(parts[1])]
+                except FileNotFoundError:
+                    page_files = []
+            else:
+                page_files = self.find_headword(parts[1])
+
+            if len(page_files) == 1:
+                return 200, CONTENT_TYPES['.html'], self.render(page_files[0], kindle).encode('utf-8')
+            if page_files:
+                # Homographs, let the user pick one
+                return 200, CONTENT_TYPES['.html'], self.index_page(page_files).encode('utf-8')
+
+        return 404, 'text/plain', b'Not found'
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            # Skip the request headers
+            while (await reader.readline()).strip():
+                pass
+
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+            if method != 'GET':
+                status, content_type, body = 405, 'text/plain', b'Method not allowed'
+            else:
+                try:
+                    # Parsing is CPU bound, keep the event loop free for other requests
+                    status, content_type, body = await asyncio.to_thread(self.handle, path)
+                except Exception as e:
+                    status, content_type, body = 500, 'text/plain', str(e).encode('utf-8')
+
+            writer.write(f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n'
+                         f'Content-Type: {content_type}\r\n'
+                         f'Content-Length: {len(body)}\r\n'
+                         'Connection: close\r\n\r\n'.encode('latin-1'))
+            writer.write(body)
+            await writer.drain()
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving previews on http://{host}:{port}/")
+        async with server:
+            await server.serve_forever()
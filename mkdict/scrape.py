@@ -10,7 +10,9 @@ from selenium.webdriver.chrome.options import Options
 
 from bs4 import BeautifulSoup
 
-URL_BASE = "https://ordbokene.no/bm/{}"
+from mkdict.editions import Edition, EDITIONS, DEFAULT_EDITION
+
+URL_BASE = EDITIONS[DEFAULT_EDITION].url_base
 
 
 def download_page(url: str, dest_dir: str) -> None:
@@ -58,12 +60,14 @@ def download_page(url: str, dest_dir: str) -> None:
 
     # Save the HTML to a file
     dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
     page_index = url.split('/')[-1]
-    with open(dest_dir / f"page_{page_index}.html", "w") as f:
+    with open(dest_dir / f"page_{page_index}.html", "w", encoding="utf-8") as f:
         f.write(pretty_html)
 
 
-def download_pages(indexes, dest_dir):
+def download_pages(indexes, dest_dir, edition: Edition = EDITIONS[DEFAULT_EDITION]):
+    url_base = edition.url_base
     for page_range in indexes.split(','):
         page_range = page_range.strip()
         # Check if the input is a range or a single page
@@ -71,10 +75,10 @@ def download_pages(indexes, dest_dir):
             # It's a range
             start, end = map(int, page_range.split('-'))
             for i in range(start, end + 1):
-                url = URL_BASE.format(i)
+                url = url_base.format(i)
                 download_page(url, dest_dir)
         else:
             # It's a single page
             page_index = int(page_range)
-            url = URL_BASE.format(page_index)
+            url = url_base.format(page_index)
             download_page(url, dest_dir)
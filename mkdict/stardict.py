@@ -0,0 +1,236 @@
+import bisect
+import json
+import struct
+import tempfile
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterable, List
+
+from mkdict.collation import external_sort
+from mkdict.dict_entry import DictionaryEntry, dictionary_entry_to_html_body
+from mkdict.lookup import entry_forms, INFLECTION
+
+# Uncompressed size of a dictzip chunk, every compressed chunk then fits in 2 bytes
+DICTZIP_CHUNK_LENGTH = 58315
+# Chunk sizes are stored in the gzip extra field, which is at most 65535 bytes
+DICTZIP_MAX_CHUNKS = (0xFFFF - 10) // 2
+
+GZIP_FEXTRA = 0x04
+IDX_RECORD = struct.Struct('>II')  # offset and size of the definition in the .dict file
+SYN_RECORD = struct.Struct('>I')  # position of the entry in the .idx file
+
+
+def stardict_sort_key(word: str) -> str:
+    """
+    Sort key matching StarDict's stardict_strcmp: ASCII case-insensitive byte order
+    with ties broken by the exact bytes. Comparing str code points gives the same
+    order as comparing their UTF-8 bytes.
+    """
+    folded = ''.join(char.lower() if char.isascii() else char for char in word)
+    return f"{folded}\0{word}"
+
+
+class DictzipWriter:
+    """
+    Writes a .dict.dz file: a gzip file whose deflate stream is flushed every
+    DICTZIP_CHUNK_LENGTH bytes so readers can decompress any chunk on its own.
+    The compressed chunks are spooled to a temporary file because their sizes
+    have to be written in the gzip header.
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = Path(file_path)
+        self.spool = tempfile.TemporaryFile()
+        self.compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.buffer = bytearray()
+        self.chunk_sizes = []
+        self.crc = 0
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        """ Append data and return its uncompressed offset."""
+        offset = self.size
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        self.buffer += data
+        while len(self.buffer) >= DICTZIP_CHUNK_LENGTH:
+            self.write_chunk(bytes(self.buffer[:DICTZIP_CHUNK_LENGTH]), zlib.Z_FULL_FLUSH)
+            del self.buffer[:DICTZIP_CHUNK_LENGTH]
+        return offset
+
+    def write_chunk(self, chunk: bytes, flush_mode: int):
+        compressed = self.compressor.compress(chunk) + self.compressor.flush(flush_mode)
+        self.chunk_sizes.append(len(compressed))
+        self.spool.write(compressed)
+
+    def close(self):
+        self.write_chunk(bytes(self.buffer), zlib.Z_FINISH)
+        if len(self.chunk_sizes) > DICTZIP_MAX_CHUNKS:
+            raise ValueError(f"Dictionary too large for dictzip ({len(self.chunk_sizes)} chunks).")
+
+        random_access = struct.pack(f'<HHH{len(self.chunk_sizes)}H', 1, DICTZIP_CHUNK_LENGTH,
+                                    len(self.chunk_sizes), *self.chunk_sizes)
+        extra = b'RA' + struct.pack('<H', len(random_access)) + random_access
+
+        with open(self.file_path, 'wb') as file:
+            # ID1, ID2, deflate, FEXTRA, mtime, max compression, unix
+            file.write(struct.pack('<BBBBIBB', 0x1f, 0x8b, 8, GZIP_FEXTRA, int(time.time()), 2, 3))
+            file.write(struct.pack('<H', len(extra)) + extra)
+            self.spool.seek(0)
+            while data := self.spool.read(1 << 20):
+                file.write(data)
+            file.write(struct.pack('<II', self.crc, self.size & 0xFFFFFFFF))
+
+        self.spool.close()
+
+
+class DictzipReader:
+    """ Random access reads from a .dict.dz file, decompressing only the needed chunks."""
+
+    def __init__(self, file_path: Path):
+        self.file = open(file_path, 'rb')
+        header = self.file.read(10)
+        if header[:2] != b'\x1f\x8b' or not header[3] & GZIP_FEXTRA:
+            raise ValueError(f"{file_path} is not a dictzip file.")
+
+        extra_length, = struct.unpack('<H', self.file.read(2))
+        extra = self.file.read(extra_length)
+        if extra[:2] != b'RA':
+            raise ValueError(f"{file_path} has no dictzip random access table.")
+
+        _, self.chunk_length, chunk_count = struct.unpack_from('<HHH', extra, 4)
+        chunk_sizes = struct.unpack_from(f'<{chunk_count}H', extra, 10)
+        self.chunk_offsets = [12 + extra_length]
+        for chunk_size in chunk_sizes:
+            self.chunk_offsets.append(self.chunk_offsets[-1] + chunk_size)
+
+    def close(self):
+        self.file.close()
+
+    def chunk(self, i) -> bytes:
+        self.file.seek(self.chunk_offsets[i])
+        compressed = self.file.read(self.chunk_offsets[i + 1] - self.chunk_offsets[i])
+        return zlib.decompressobj(-zlib.MAX_WBITS).decompress(compressed)
+
+    def read(self, offset: int, size: int) -> bytes:
+        first, last = offset // self.chunk_length, (offset + size - 1) // self.chunk_length
+        data = b''.join(self.chunk(i) for i in range(first, last + 1))
+        start = offset - first * self.chunk_length
+        return data[start:start + size]
+
+
+def export_stardict(entries: Iterable[DictionaryEntry], dest_dir: Path, name: str,
+                    bookname: str = 'Ordbøkene') -> int:
+    """
+    Writes {name}.ifo, {name}.idx, {name}.syn and {name}.dict.dz to dest_dir.
+    Definitions are streamed into the compressed .dict.dz as entries arrive; the
+    .idx and .syn records are sorted with external_sort, so only fixed-size
+    offsets are kept in memory per entry.
+
+    :param entries: DictionaryEntry instances, e.g. a generator over parsed pages
+    :param dest_dir: Output directory
+    :param name: Base name of the output files
+    :param bookname: Dictionary title shown by the reader
+    :return: Number of exported entries
+    """
+    dest_dir = Path(dest_dir)
+    dict_writer = DictzipWriter(dest_dir / f"{name}.dict.dz")
+    # Synonym records are spooled to disk until the .idx positions are known
+    syn_spool = tempfile.TemporaryFile('w+', encoding='utf-8')
+
+    def idx_records():
+        for entry_number, entry in enumerate(entries):
+            definition = dictionary_entry_to_html_body(entry).encode('utf-8')
+            offset = dict_writer.write(definition)
+            for form, kind in entry_forms(entry):
+                if kind == INFLECTION and form != entry.word:
+                    syn_spool.write(f"{form}\t{entry_number}\n")
+            yield stardict_sort_key(entry.word), json.dumps([entry.word, entry_number, offset, len(definition)])
+
+    def syn_records():
+        syn_spool.seek(0)
+        for line in syn_spool:
+            form, entry_number = line.rstrip('\n').split('\t')
+            yield stardict_sort_key(form), f"{form}\t{entry_number}"
+
+    # Position of every entry in the sorted .idx, indexed by entry number
+    idx_positions = array('I')
+    with open(dest_dir / f"{name}.idx", 'wb') as idx_file:
+        for position, (_, record) in enumerate(external_sort(idx_records())):
+            word, entry_number, offset, size = json.loads(record)
+            idx_file.write(word.encode('utf-8') + b'\0' + IDX_RECORD.pack(offset, size))
+            if entry_number >= len(idx_positions):
+                idx_positions.extend([0] * (entry_number + 1 - len(idx_positions)))
+            idx_positions[entry_number] = position
+        idx_file_size = idx_file.tell()
+    dict_writer.close()
+
+    syn_count = 0
+    previous_record = None
+    with open(dest_dir / f"{name}.syn", 'wb') as syn_file:
+        for _, record in external_sort(syn_records()):
+            # Sorting puts repeated forms of the same entry next to each other
+            if record == previous_record:
+                continue
+            previous_record = record
+            form, entry_number = record.split('\t')
+            syn_file.write(form.encode('utf-8') + b'\0' + SYN_RECORD.pack(idx_positions[int(entry_number)]))
+            syn_count += 1
+    syn_spool.close()
+
+    with open(dest_dir / f"{name}.ifo", 'w', encoding='utf-8', newline='\n') as ifo_file:
+        ifo_file.write("StarDict's dict ifo file\n"
+                       "version=3.0.0\n"
+                       f"bookname={bookname}\n"
+                       f"wordcount={len(idx_positions)}\n"
+                       f"synwordcount={syn_count}\n"
+                       f"idxfilesize={idx_file_size}\n"
+                       "sametypesequence=h\n")
+
+    return len(idx_positions)
+
+
+class StarDictReader:
+    """ Minimal StarDict reader used to check and benchmark exported dictionaries."""
+
+    def __init__(self, dest_dir: Path, name: str):
+        dest_dir = Path(dest_dir)
+        self.words, self.records = self.read_index(dest_dir / f"{name}.idx", IDX_RECORD)
+        syn_words, syn_records = self.read_index(dest_dir / f"{name}.syn", SYN_RECORD)
+        self.synonyms = {}
+        for word, (position,) in zip(syn_words, syn_records):
+            self.synonyms.setdefault(word, []).append(position)
+        self.keys = [stardict_sort_key(word) for word in self.words]
+        self.dict_reader = DictzipReader(dest_dir / f"{name}.dict.dz")
+
+    @staticmethod
+    def read_index(file_path: Path, record: struct.Struct):
+        with open(file_path, 'rb') as file:
+            data = file.read()
+        words, records = [], []
+        i = 0
+        while i < len(data):
+            end = data.index(b'\0', i)
+            words.append(data[i:end].decode('utf-8'))
+            records.append(record.unpack_from(data, end + 1))
+            i = end + 1 + record.size
+        return words, records
+
+    def close(self):
+        self.dict_reader.close()
+
+    def definition(self, position: int) -> str:
+        offset, size = self.records[position]
+        return self.dict_reader.read(offset, size).decode('utf-8')
+
+    def lookup(self, word: str) -> List[str]:
+        """ Definitions of entries with the word as headword or inflected form."""
+        positions = []
+        i = bisect.bisect_left(self.keys, stardict_sort_key(word))
+        while i < len(self.words) and self.words[i] == word:
+            positions.append(i)
+            i += 1
+        positions += self.synonyms.get(word, [])
+        return [self.definition(position) for position in positions]
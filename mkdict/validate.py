@@ -0,0 +1,242 @@
+import mmap
+import os
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+IDX_NS = "https://kindlegen.s3.amazonaws.com/AmazonKindlePublishingGuidelines.pdf"
+OPF_NS = "http://www.idpf.org/2007/opf"
+
+ENTRY_SEPARATOR = b'<hr/>'
+FRAMESET_START = b'<mbp:frameset>'
+FRAMESET_END = b'</mbp:frameset>'
+# Number of entries in a shard, a content file with a single shard is validated in the main process
+ENTRIES_PER_SHARD = 2000
+
+# Root element wrapped around a shard of entries so it can be parsed on its own
+SHARD_START = f'<shard xmlns:idx="{IDX_NS}" xmlns:mbp="{IDX_NS}">'
+SHARD_END = '</shard>'
+
+# Expat reports namespaced tags as "namespace}name"
+IDX_ENTRY = f'{IDX_NS}}}entry'
+IDX_SHORT = f'{IDX_NS}}}short'
+IDX_ORTH = f'{IDX_NS}}}orth'
+IDX_INFL = f'{IDX_NS}}}infl'
+IDX_IFORM = f'{IDX_NS}}}iform'
+
+
+class EntryChecker:
+    """ Expat handlers that check the idx structure of a shard of entries."""
+
+    def __init__(self, shard_index: int):
+        self.shard_index = shard_index
+        self.errors = []
+        self.entry_ids = []
+        self.stack = []
+        self.n_entries = 0
+        self.n_orth = 0
+        # Id of the current entry, None until its <a id> has been seen
+        self.entry_id = None
+
+    def location(self) -> str:
+        """ Shard, entry number and id of the entry being parsed, to find the page it came from."""
+        if self.entry_id is not None:
+            return f"shard {self.shard_index}, entry {self.n_entries} (id '{self.entry_id}')"
+        if self.entry_ids:
+            return f"shard {self.shard_index}, entry {self.n_entries} (after id '{self.entry_ids[-1]}')"
+        return f"shard {self.shard_index}, entry {self.n_entries}"
+
+    def error(self, message):
+        self.errors.append(f"{self.location()}: {message}")
+
+    def start_element(self, tag, attributes):
+        self.stack.append(tag)
+        if tag == IDX_ENTRY:
+            self.n_entries += 1
+            self.n_orth = 0
+            self.entry_id = None
+        elif tag == IDX_ORTH:
+            self.n_orth += 1
+            if not attributes.get('value'):
+                self.error("idx:orth without a value")
+        elif tag == IDX_IFORM:
+            if self.stack[-3:-1] != [IDX_ORTH, IDX_INFL]:
+                self.error("idx:iform outside idx:orth/idx:infl")
+            if not attributes.get('value'):
+                self.error("idx:iform without a value")
+        elif tag == 'a' and attributes.get('id') and IDX_SHORT in self.stack:
+            self.entry_id = attributes['id']
+            self.entry_ids.append(attributes['id'])
+
+    def end_element(self, tag):
+        self.stack.pop()
+        if tag == IDX_ENTRY and self.n_orth != 1:
+            self.error(f"{self.n_orth} idx:orth elements, expected 1")
+
+
+def validate_entries(shard: bytes, shard_index: int) -> Tuple[List[str], List[str]]:
+    """
+    Streams a shard of entries through expat and checks that every idx:entry has
+    one idx:orth with a value, and that idx:iform elements with a value only
+    appear inside idx:infl within idx:orth.
+
+    :param shard: UTF-8 encoded XHTML of consecutive entries
+    :param shard_index: Index of the shard, used in error messages
+    :return: Tuple of (errors, entry ids)
+    """
+    checker = EntryChecker(shard_index)
+    parser = expat.ParserCreate(namespace_separator='}')
+    parser.StartElementHandler = checker.start_element
+    parser.EndElementHandler = checker.end_element
+
+    try:
+        parser.Parse(SHARD_START)
+        parser.Parse(shard)
+        parser.Parse(SHARD_END, True)
+    except expat.ExpatError as e:
+        return [f"{checker.location()}: not well-formed XML: {e}"], checker.entry_ids
+
+    return checker.errors, checker.entry_ids
+
+
+def validate_shard(content_file: Path, offset: int, length: int, shard_index: int) -> Tuple[List[str], List[str]]:
+    """ Reads one shard of entries from the content file and validates it."""
+    with open(content_file, 'rb') as f:
+        f.seek(offset)
+        return validate_entries(f.read(length), shard_index)
+
+
+def shard_boundaries(content: mmap.mmap, start: int, end: int) -> List[Tuple[int, int]]:
+    """ (offset, length) of shards of ENTRIES_PER_SHARD entries between start and end."""
+    shards = []
+    shard_start = position = start
+    n_entries = 1
+    while True:
+        separator = content.find(ENTRY_SEPARATOR, position, end)
+        if separator == -1:
+            break
+        position = separator + len(ENTRY_SEPARATOR)
+        if n_entries % ENTRIES_PER_SHARD == 0:
+            shards.append((shard_start, separator - shard_start))
+            shard_start = position
+        n_entries += 1
+    shards.append((shard_start, end - shard_start))
+
+    return shards
+
+
+def validate_links(skeleton: ET.Element, build_dir: Path, file_name: str) -> List[str]:
+    """ Checks that every <link href> of the document points to an existing file."""
+    errors = []
+    for link in skeleton.iter('link'):
+        href = link.get('href')
+        if not href or not (build_dir / href).is_file():
+            errors.append(f"{file_name}: link references missing file '{href}'")
+    return errors
+
+
+def validate_content(content_file: Path, max_workers=None) -> List[str]:
+    """
+    Validates the generated content file. The document around the entries is
+    parsed on its own and its links are checked, the entries are split into
+    shards at entry separators and validated in parallel, and entry ids are
+    checked to be unique across all shards. The file is memory-mapped to find
+    the shard boundaries and every worker reads its own shard, so the entries
+    are never loaded in memory at once.
+
+    :param content_file: Path to the generated content XHTML
+    :param max_workers: Number of processes, defaults to the number of CPUs
+    :return: List of error messages, empty if the content is valid
+    """
+    with open(content_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [f"{content_file.name}: {FRAMESET_START.decode()} not found"]
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            start = content.find(FRAMESET_START)
+            end = content.rfind(FRAMESET_END)
+            if start == -1 or end == -1:
+                return [f"{content_file.name}: {FRAMESET_START.decode()} not found"]
+            start += len(FRAMESET_START)
+
+            # The document without the entries
+            skeleton = content[:start] + content[end:]
+            shards = shard_boundaries(content, start, end)
+
+    errors = []
+    try:
+        errors.extend(validate_links(ET.fromstring(skeleton), content_file.parent, content_file.name))
+    except ET.ParseError as e:
+        errors.append(f"{content_file.name}: not well-formed XML outside the entries: {e}")
+
+    if len(shards) > 1:
+        offsets, lengths = zip(*shards)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(validate_shard, [content_file] * len(shards), offsets, lengths,
+                                        range(len(shards))))
+    else:
+        results = [validate_shard(content_file, *shards[0], 0)]
+
+    seen_ids = set()
+    for shard_errors, entry_ids in results:
+        errors.extend(shard_errors)
+        for entry_id in entry_ids:
+            if entry_id in seen_ids:
+                errors.append(f"{content_file.name}: duplicate entry id '{entry_id}'")
+            seen_ids.add(entry_id)
+
+    return errors
+
+
+def validate_opf(opf_file: Path) -> List[str]:
+    """
+    Checks that the OPF manifest items exist, the spine only references manifest
+    items and the cover image is in the manifest.
+
+    :param opf_file: Path to the dict.opf file
+    :return: List of error messages, empty if the OPF is valid
+    """
+    try:
+        package = ET.parse(opf_file).getroot()
+    except ET.ParseError as e:
+        return [f"{opf_file.name}: not well-formed XML: {e}"]
+
+    errors = []
+    manifest_ids = set()
+    for item in package.iterfind(f'{{{OPF_NS}}}manifest/{{{OPF_NS}}}item'):
+        item_id, href = item.get('id'), item.get('href')
+        if item_id in manifest_ids:
+            errors.append(f"{opf_file.name}: duplicate manifest id '{item_id}'")
+        manifest_ids.add(item_id)
+        if not href or not (opf_file.parent / href).is_file():
+            errors.append(f"{opf_file.name}: manifest item '{item_id}' references missing file '{href}'")
+
+    spine = package.find(f'{{{OPF_NS}}}spine')
+    if spine is None:
+        errors.append(f"{opf_file.name}: spine not found")
+    else:
+        for element in spine:
+            if element.tag == f'{{{OPF_NS}}}itemref':
+                if element.get('idref') not in manifest_ids:
+                    errors.append(f"{opf_file.name}: spine references unknown item '{element.get('idref')}'")
+            elif isinstance(element.tag, str):
+                errors.append(f"{opf_file.name}: unexpected element '{element.tag.split('}')[-1]}' in spine")
+
+    for meta in package.iter(f'{{{OPF_NS}}}meta'):
+        if meta.get('name') == 'cover' and meta.get('content') not in manifest_ids:
+            errors.append(f"{opf_file.name}: cover '{meta.get('content')}' is not in the manifest")
+
+    return errors
+
+
+def validate_build(build_dir: Path, content_file_name='content000.xhtml', opf_file_name='dict.opf') -> List[str]:
+    """
+    Validates the compiled Kindle source directory.
+
+    :param build_dir: Directory with the compiled dictionary
+    :return: List of error messages, empty if the build is valid
+    """
+    build_dir = Path(build_dir)
+    return validate_opf(build_dir / opf_file_name) + validate_content(build_dir / content_file_name)
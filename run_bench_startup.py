@@ -0,0 +1,57 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Commands that must start without importing the heavy dependencies
+LIGHT_COMMANDS = [
+    ['--help'],
+    ['stats'],
+]
+HEAVY_MODULES = ['selenium', 'bs4', 'mkdict.parse_html', 'mkdict.scrape', 'mkdict.compile']
+
+
+def imported_modules(command):
+    """ Top-level names of the modules imported by the command, from python -X importtime."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'mkdict', *command],
+                            capture_output=True, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            modules.add(line.rsplit('|', 1)[1].strip())
+    return modules
+
+
+def time_command(command, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'mkdict', *command], capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the startup time of light mkdict commands.')
+    parser.add_argument('--runs', type=int, default=10, help='Number of runs per command.')
+    parser.add_argument('--max-ms', type=float, default=150,
+                        help='Fail if the median startup time of a command exceeds this.')
+    args = parser.parse_args()
+
+    failed = False
+    for command in LIGHT_COMMANDS:
+        name = ' '.join(['mkdict', *command])
+        median_ms = time_command(command, args.runs)
+        heavy = sorted(module for module in imported_modules(command)
+                       if any(module == heavy or module.startswith(heavy + '.') for heavy in HEAVY_MODULES))
+
+        print(f"{name}: {median_ms:.1f} ms median over {args.runs} runs")
+        if heavy:
+            print(f"  imports heavy modules: {', '.join(heavy)}")
+            failed = True
+        if median_ms > args.max_ms:
+            print(f"  slower than {args.max_ms:.0f} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
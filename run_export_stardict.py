@@ -0,0 +1,55 @@
+import argparse
+import random
+import time
+from pathlib import Path
+
+from mkdict.compile import parse_pages
+from mkdict.dedup import DedupReport, dedupe_entries
+from mkdict.editions import EDITIONS, DEFAULT_EDITION
+from mkdict.stardict import export_stardict, StarDictReader
+
+PAGES_DIR = Path('pages')
+DEST_DIR = Path('stardict_compiled')
+NAME = 'ordbokene'
+
+
+def benchmark(dest_dir, name, n_lookups):
+    reader = StarDictReader(dest_dir, name)
+    words = reader.words + list(reader.synonyms)
+    if not words:
+        print("Nothing to benchmark, the dictionary is empty.")
+        return
+    queries = [random.choice(words) for _ in range(n_lookups)]
+
+    start = time.perf_counter()
+    for word in queries:
+        reader.lookup(word)
+    elapsed = time.perf_counter() - start
+    reader.close()
+
+    print(f"{n_lookups} lookups in {elapsed:.3f}s ({1000 * elapsed / n_lookups:.3f} ms per lookup)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export downloaded pages as a StarDict dictionary.')
+    parser.add_argument('--pages', type=Path, default=PAGES_DIR,
+                        help='Directory with downloaded pages, one subdirectory per edition.')
+    parser.add_argument('--edition', choices=sorted(EDITIONS), default=DEFAULT_EDITION,
+                        help=f'Edition to export (default: {DEFAULT_EDITION}).')
+    parser.add_argument('--dest', type=Path, default=DEST_DIR, help='Output directory.')
+    parser.add_argument('--name', type=str, default=NAME, help='Base name of the StarDict files.')
+    parser.add_argument('--benchmark', type=int, default=0, metavar='N',
+                        help='Time N random lookups in the exported dictionary.')
+    args = parser.parse_args()
+
+    args.dest.mkdir(parents=True, exist_ok=True)
+    # Same parse and dedup stages as the Kindle build, so both dictionaries hold the same lexicon
+    dedup_report = DedupReport()
+    entries = dedupe_entries(parse_pages(args.pages / EDITIONS[args.edition].code, dedup_report, print),
+                             dedup_report)
+    n_entries = export_stardict(entries, args.dest, args.name, bookname=EDITIONS[args.edition].title)
+    dedup_report.pretty_print()
+    print(f"Exported {n_entries} entries to {args.dest}")
+
+    if args.benchmark:
+        benchmark(args.dest, args.name, args.benchmark)
@@ -0,0 +1,93 @@
+import argparse
+import time
+from pathlib import Path
+
+from mkdict.editions import EDITIONS, DEFAULT_EDITION
+
+PAGES_DIR = Path('pages')
+INDEX_FILE = Path('lookup.idx')
+
+
+def build(args):
+    from mkdict.compile import parse_pages
+    from mkdict.dedup import DedupReport, dedupe_entries
+    from mkdict.lookup import build_lookup_index
+
+    # Same parse and dedup stages as the Kindle build, so the index holds the compiled lexicon
+    dedup_report = DedupReport()
+    pages_dir = args.pages / EDITIONS[args.edition].code
+    entries = list(dedupe_entries(parse_pages(pages_dir, dedup_report, print), dedup_report))
+    dedup_report.pretty_print()
+
+    n_forms = build_lookup_index(entries, args.index)
+    print(f"Indexed {n_forms} forms of {len(entries)} entries into {args.index}")
+
+
+def query(args):
+    from mkdict.lookup import LookupIndex
+
+    with LookupIndex(args.index) as index:
+        for word in args.words:
+            start = time.perf_counter()
+            if args.prefix:
+                results = index.prefix(word, limit=args.limit)
+            elif args.inflected:
+                results = index.inflected(word)
+            else:
+                results = index.exact(word)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{word}: {len(results)} results in {elapsed_ms:.3f} ms")
+            for result in results:
+                print(f"  {result.form} ({result.kind})")
+                if args.show:
+                    print(result.entry)
+
+
+def coverage(args):
+    from mkdict.lookup import LookupIndex
+
+    with open(args.words_file, 'r', encoding='utf-8') as f:
+        words = [line.strip() for line in f if line.strip()]
+
+    missing = []
+    with LookupIndex(args.index) as index:
+        start = time.perf_counter()
+        for word in words:
+            if not index.exact(word):
+                missing.append(word)
+        elapsed = time.perf_counter() - start
+
+    found = len(words) - len(missing)
+    print(f"Found {found} of {len(words)} words "
+          f"({1000 * elapsed / max(len(words), 1):.3f} ms per lookup)")
+    for word in missing:
+        print(f"  missing: {word}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Look up words in the compiled lexicon without a Kindle.')
+    parser.add_argument('--index', type=Path, default=INDEX_FILE, help='Path to the lookup index file.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build the lookup index from downloaded pages.')
+    build_parser.add_argument('--pages', type=Path, default=PAGES_DIR,
+                              help='Directory with downloaded pages, one subdirectory per edition.')
+    build_parser.add_argument('--edition', choices=sorted(EDITIONS), default=DEFAULT_EDITION,
+                              help=f'Edition to index (default: {DEFAULT_EDITION}).')
+    build_parser.set_defaults(func=build)
+
+    query_parser = subparsers.add_parser('query', help='Look up headwords or inflected forms.')
+    query_parser.add_argument('words', nargs='+', help='Words to look up.')
+    query_parser.add_argument('--prefix', action='store_true', help='Match forms starting with the word.')
+    query_parser.add_argument('--inflected', action='store_true', help='Only match inflected forms.')
+    query_parser.add_argument('--limit', type=int, default=20, help='Maximum number of prefix matches.')
+    query_parser.add_argument('--show', action='store_true', help='Print the rendered entries.')
+    query_parser.set_defaults(func=query)
+
+    coverage_parser = subparsers.add_parser('coverage', help='Check which words of a word list can be looked up.')
+    coverage_parser.add_argument('words_file', type=Path, help='File with one word per line.')
+    coverage_parser.set_defaults(func=coverage)
+
+    args = parser.parse_args()
+    args.func(args)
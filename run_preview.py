@@ -0,0 +1,23 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from mkdict.editions import EDITIONS, DEFAULT_EDITION
+from mkdict.preview import PreviewServer
+
+PAGES_DIR = Path('pages')
+SRC_DIR = Path('kindle_src')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Preview downloaded pages as dictionary entries in the browser.')
+    parser.add_argument('--pages', type=Path, default=PAGES_DIR,
+                        help='Directory with downloaded pages, one subdirectory per edition.')
+    parser.add_argument('--edition', choices=sorted(EDITIONS), default=DEFAULT_EDITION,
+                        help=f'Edition to preview (default: {DEFAULT_EDITION}).')
+    parser.add_argument('--src', type=Path, default=SRC_DIR, help='Kindle source directory with styles and images.')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server = PreviewServer(args.pages / EDITIONS[args.edition].code, args.src)
+    asyncio.run(server.serve(args.host, args.port))
@@ -1,13 +1,7 @@
-import argparse
+import sys
 
-from mkdict.scrape import download_pages
-
-DEST_DIR = 'pages'
+from mkdict.cli import main
 
 if __name__ == "__main__":
-    # Create the parser
-    parser = argparse.ArgumentParser(description='Download pages by index or range.')
-    parser.add_argument('indexes', type=str, help='Comma-separated list of single indexes or ranges (e.g., "1,2,10-20,22,30-50").')
-    args = parser.parse_args()
-
-    download_pages(args.indexes, DEST_DIR)
+    # Same as: python -m mkdict scrape [options] indexes
+    sys.exit(main(['scrape'] + sys.argv[1:]))